@@ -2,7 +2,6 @@ from mimetypes import init
 
 from flask import Flask, jsonify
 from flask_cors import CORS
-from gs_api import final_df, students_df, attendance_df, assessments_df, fees_df
 from flask_jwt_extended import JWTManager
 from application.resources import init_api
 from application.config import LocalDevelopmentConfig
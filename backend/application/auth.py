@@ -49,6 +49,7 @@ class MentorLoginResource(Resource):
             # Generate JWT tokens
             access_token = create_access_token(
                 identity=str(mentor["id"]),      # <--- only id as string
+                additional_claims={"email": mentor["email"]},  # scopes /mentor/students_df
                 expires_delta=timedelta(hours=1)
             )
             refresh_token = create_refresh_token(identity=str(mentor["id"]))
@@ -16,6 +16,7 @@ def init_api(app):
     
     # Students resources
     api.add_resource(Student_df, "/students_df")
+    api.add_resource(Mentor_students_df, "/mentor/students_df")
     api.add_resource(Students_info, "/students_info")
     api.add_resource(Attendance_info, "/attendance_info")
     api.add_resource(Assessments_info,"/assessments_info")
@@ -0,0 +1,43 @@
+import hashlib
+import json
+import numpy as np
+from gs_api import current_final_df, scoring_key, df_filled
+
+
+def normalize_email(email):
+    """Sheet and mentor-table emails can differ in case/whitespace; compare them like this."""
+    return email.strip().lower()
+
+
+def partition_by_mentor(df, mentor_emails):
+    """
+    Split the scored snapshot by mentor and serialize each partition once.
+
+    :param df: The scored students dataframe (final_df).
+    :param mentor_emails: Series of mentor emails aligned with df's index.
+    :return: Dict of normalized mentor_email -> (json payload bytes, etag).
+    """
+    partitions = {}
+    records = df.replace({np.nan: None})
+    keys = mentor_emails.astype(str).map(normalize_email)
+    for mentor_email, part in records.groupby(keys, sort=False):
+        payload = json.dumps(part.to_dict('records'), default=str).encode('utf-8')
+        partitions[mentor_email] = (payload, hashlib.sha1(payload).hexdigest())
+    return partitions
+
+
+EMPTY_PARTITION = (b'[]', hashlib.sha1(b'[]').hexdigest())
+
+_partitions = {'key': None, 'partitions': None}
+
+def get_mentor_partitions():
+    """Partitions of the live scored snapshot, rebuilt when the model or fill values change."""
+    key = scoring_key()
+    if _partitions['key'] != key:
+        _partitions['partitions'] = partition_by_mentor(current_final_df(), df_filled['mentor_email'])
+        _partitions['key'] = key
+    return _partitions['partitions']
+
+
+# built at startup; later requests are a dict lookup until the scoring key changes
+get_mentor_partitions()
@@ -1,16 +1,31 @@
 # ML model predicted df
 import numpy as np
-from flask import jsonify
-from gs_api import final_df, students_df, attendance_df, assessments_df, fees_df
+from flask import jsonify, request, Response
+from gs_api import current_final_df, students_df, attendance_df, assessments_df, fees_df
 from flask_restful import Resource
+from flask_jwt_extended import jwt_required, get_jwt
+from .student_partitions import get_mentor_partitions, normalize_email, EMPTY_PARTITION
 
 
 class Student_df(Resource):
     def get(self):
         # Replace NaN with None (turns into null in JSON)
-        students_data = final_df.replace({np.nan: None}).to_dict('records')
+        students_data = current_final_df().replace({np.nan: None}).to_dict('records')
         return jsonify(students_data)
 
+# only the logged-in mentor's students, with a per-mentor ETag
+class Mentor_students_df(Resource):
+    @jwt_required()
+    def get(self):
+        mentor_email = get_jwt().get("email")
+        if not mentor_email:
+            return {"message": "Token has no mentor email, please log in again"}, 401
+
+        payload, etag = get_mentor_partitions().get(normalize_email(mentor_email), EMPTY_PARTITION)
+        response = Response(payload, mimetype='application/json')
+        response.set_etag(etag)
+        return response.make_conditional(request)
+
 # all spreadSheet dataset
 class Students_info(Resource):
     def get(self):
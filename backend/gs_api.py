@@ -5,8 +5,8 @@ import pandas as pd
 from dotenv import load_dotenv
 import gspread
 from supabase import create_client
-import joblib
-from sklearn.preprocessing import LabelEncoder
+from imputation_stats import ImputationStats, IMPUTATION_STATS_PATH
+from model_registry import ModelRegistry, SNAPSHOT_PATH
 
 
 load_dotenv()
@@ -184,40 +184,53 @@ df_with_nan= (df_students
     )
 
 
-df_filled= df_with_nan.fillna({
-    'attendance_percentage': df_attendance_info['attendance_percentage'].mean(),
-    'q1_average_test_score': df_assessments_info['q1_average_test_score'].mean(),
-    'q2_average_test_score': df_assessments_info['q2_average_test_score'].mean(),
-    'q3_average_test_score': df_assessments_info['q3_average_test_score'].mean(),
-    'q1_test_score_trend': df_assessments_info['q1_test_score_trend'].mode()[0],
-    'q2_test_score_trend': df_assessments_info['q2_test_score_trend'].mode()[0],
-    'q3_test_score_trend': df_assessments_info['q3_test_score_trend'].mode()[0],
-    'q1_attempts_used': df_assessments_info['q1_attempts_used'].mode()[0],
-    'q2_attempts_used': df_assessments_info['q2_attempts_used'].mode()[0],
-    'q3_attempts_used': df_assessments_info['q3_attempts_used'].mode()[0],
-    'fee_status': df_fees_info['fee_status'].mode()[0],
-    'fee_due_date': df_fees_info['fee_due_date'].mode()[0]
+# fill stats move by the rows this sync inserted/deleted (found by diffing against the
+# rows persisted at the previous sync); a cold start or spec change rebuilds them
+imputation_stats= ImputationStats.load(IMPUTATION_STATS_PATH)
+imputation_stats.sync({
+    'attendance': df_attendance_info,
+    'assessments': df_assessments_info,
+    'fees': df_fees_info
 })
+imputation_stats.save(IMPUTATION_STATS_PATH)
 
+df_filled= df_with_nan.fillna(imputation_stats.fill_values())
 
-df= df_filled.drop(['gpa','class', 'batch','mentor_email', 'parent_email', 'parent_phone' ], axis=1)
 
-# make a lable encoder
+df_filled.to_pickle(SNAPSHOT_PATH)  # training input for train_model.py
 
 
+# score with whichever bundle models/LATEST points at (legacy pickle until one is trained)
+model_registry= ModelRegistry()
 
-le= LabelEncoder()
-df['fee_status']= le.fit_transform(df['fee_status'])
+def score_students(df_filled, bundle):
+    df= df_filled.drop(['gpa','class', 'batch','mentor_email', 'parent_email', 'parent_phone' ], axis=1)
+    df= bundle.encode(df)
 
+    y_predict= bundle.model.predict_proba(bundle.feature_matrix(df))
+    # a model trained without some risk level still gets all three columns
+    y_predict= pd.DataFrame(y_predict, columns=bundle.model.classes_).reindex(columns=[0, 1, 2], fill_value=0).values
 
+    df['high_risk']= y_predict[:, 2]*100
+    df['medium_risk']= y_predict[:, 1]*100
+    df['low_risk']= y_predict[:, 0]*100
+    return df
 
-model= joblib.load('Student_risk_model.pkl')
 
-y_predict= model.predict_proba(df.drop(['student_id', 'student_name', 'program'], axis=1).values)
+_scored= {'key': None, 'df': None}
 
-df['high_risk']= y_predict[:, 2]*100
-df['medium_risk']= y_predict[:, 1]*100
-df['low_risk']= y_predict[:, 0]*100
+def scoring_key():
+    """Identifies the scored frame: changes when the model is swapped or the fill values change."""
+    return (model_registry.current().version, imputation_stats.version)
 
-final_df= df
+def current_final_df():
+    """Scored students for the live model and fill values, rescored once per key change."""
+    bundle= model_registry.current()
+    key= (bundle.version, imputation_stats.version)
+    if _scored['key'] != key:
+        _scored['df']= score_students(df_filled, bundle)
+        _scored['key']= key
+    return _scored['df']
 
+
+final_df= current_final_df()
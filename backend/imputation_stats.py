@@ -0,0 +1,240 @@
+import os
+from fractions import Fraction
+import numpy as np
+import pandas as pd
+import joblib
+
+
+# which columns of each snapshot frame are filled with a mean / a mode before scoring
+IMPUTATION_SPEC = {
+    'attendance': {
+        'mean': ['attendance_percentage'],
+        'mode': []
+    },
+    'assessments': {
+        'mean': ['q1_average_test_score', 'q2_average_test_score', 'q3_average_test_score'],
+        'mode': ['q1_test_score_trend', 'q2_test_score_trend', 'q3_test_score_trend',
+                 'q1_attempts_used', 'q2_attempts_used', 'q3_attempts_used']
+    },
+    'fees': {
+        'mean': [],
+        'mode': ['fee_status', 'fee_due_date']
+    }
+}
+
+IMPUTATION_STATS_PATH = os.getenv('IMPUTATION_STATS_PATH', 'imputation_stats.pkl')
+
+
+def exact_sum(values):
+    """
+    Exact sum of a numeric column as a Fraction, skipping NaN.
+
+    Every float is an integer mantissa times a power of two, so mantissas are summed
+    per exponent in int64 (split in 26-bit halves so the sums can't overflow).
+    """
+    values = np.asarray(values, dtype='float64')
+    values = values[~np.isnan(values)]
+    if not len(values):
+        return Fraction(0)
+
+    mantissa, exponent = np.frexp(values)
+    ints = (mantissa * 2.0 ** 53).astype(np.int64)
+    exponent = exponent.astype(np.int64) - 53
+    lowest = int(exponent.min())
+
+    total = 0
+    for e in np.unique(exponent):
+        group = ints[exponent == e]
+        high = int((group >> 26).sum())
+        low = int((group & (2 ** 26 - 1)).sum())
+        total += ((high << 26) + low) << int(e - lowest)
+    return Fraction(total) * Fraction(2) ** lowest
+
+
+def _row_hashes(df):
+    return pd.util.hash_pandas_object(df, index=False).values
+
+
+def _multiset_keys(hashes):
+    """Unique key per row: repeated rows get their hash mixed with how many came before."""
+    keys = hashes.copy()
+    repeated = np.flatnonzero(pd.Index(hashes).duplicated(keep=False))
+    if len(repeated):
+        order = np.argsort(hashes[repeated], kind='stable')
+        ordered = hashes[repeated][order]
+        positions = np.arange(len(repeated))
+        run_start = np.maximum.accumulate(np.where(np.r_[True, ordered[1:] != ordered[:-1]], positions, 0))
+        occurrence = np.empty(len(repeated), dtype=np.uint64)
+        occurrence[order] = positions - run_start
+        keys[repeated] += occurrence * np.uint64(0x9E3779B97F4A7C15)
+    return keys
+
+
+def _missing_from(keys, other):
+    """Mask of keys not present in other."""
+    return ~pd.Index(keys).isin(other)
+
+
+def _store(rows):
+    """Compact copy of tracked rows for the pickle (strings as categoricals)."""
+    return rows.astype({col: 'category' for col in rows.columns
+                        if rows[col].dtype == object or pd.api.types.is_string_dtype(rows[col])})
+
+
+def _restore(rows):
+    return rows.astype({col: object for col in rows.columns if isinstance(rows[col].dtype, pd.CategoricalDtype)})
+
+
+class ImputationStats:
+    """
+    Running sums/counts (means) and frequency tables (modes) for the fill values.
+
+    `sync` hashes each table's imputed columns, diffs them against the rows seen
+    at the previous sync and hands only the inserted/deleted rows to `apply`, so
+    the stats move by the churn; `rebuild` recomputes a table from scratch on a
+    cold start. Sums are exact fractions, so a mean is the exact mean rounded once
+    whatever the order of inserts and deletes; the mode is the smallest most
+    frequent value like `.mode()[0]`. `version` is bumped every time the fill
+    values change.
+    """
+
+    def __init__(self, spec=IMPUTATION_SPEC):
+        self.spec = spec
+        self.version = 0
+        self.rows = {}
+        self.hashes = {}
+        self.keys = {}
+        self.sums = {}
+        self.counts = {}
+        self.freqs = {}
+        for columns in spec.values():
+            for col in columns['mean']:
+                self.sums[col] = Fraction(0)
+                self.counts[col] = 0
+            for col in columns['mode']:
+                self.freqs[col] = pd.Series(dtype='int64')
+        self._fills = self._compute_fills()
+
+    @classmethod
+    def load(cls, path=IMPUTATION_STATS_PATH, spec=IMPUTATION_SPEC):
+        """Load persisted stats, or start empty if missing or built for another spec."""
+        if os.path.exists(path):
+            stats = joblib.load(path)
+            if isinstance(stats, cls) and stats.spec == spec:
+                return stats
+        return cls(spec)
+
+    def save(self, path=IMPUTATION_STATS_PATH):
+        joblib.dump(self, path)
+
+    def fill_values(self):
+        """Fill values for `DataFrame.fillna`; columns with no data are left out."""
+        return dict(self._fills)
+
+    def sync(self, frames):
+        """
+        Bring the stats in line with each table's current rows.
+
+        :param frames: Dict of table name -> dataframe holding the table's rows.
+        :return: True if the fill values changed (and version was bumped).
+        """
+        for table, df in frames.items():
+            current = self._tracked(table, df)
+            if table not in self.rows:
+                self._rebuild_table(table, current)
+                continue
+
+            hashes = _row_hashes(current)
+            keys = _multiset_keys(hashes)
+            added = current[_missing_from(keys, self.keys[table])]
+            removed = self.rows[table][_missing_from(self.keys[table], keys)]
+            self._apply(table, added=[added], removed=[_restore(removed)])
+            self._track(table, current, hashes, keys)
+        return self._refresh()
+
+    def rebuild(self, frames):
+        """
+        Recompute the stats from scratch for each table in frames.
+
+        :param frames: Dict of table name -> dataframe holding the table's rows.
+        :return: True if the fill values changed (and version was bumped).
+        """
+        for table, df in frames.items():
+            self._rebuild_table(table, self._tracked(table, df))
+        return self._refresh()
+
+    def apply(self, table, inserted=None, updated=None, deleted=None):
+        """
+        Apply changes that are already known for a table.
+
+        :param table: Name of the table in the spec (e.g. "fees").
+        :param inserted: Dataframe of inserted rows.
+        :param updated: (before, after) pair of dataframes for updated rows.
+        :param deleted: Dataframe of deleted rows.
+        :return: True if the fill values changed (and version was bumped).
+        """
+        before, after = updated if updated is not None else (None, None)
+        added = [self._tracked(table, df) for df in [inserted, after] if df is not None]
+        removed = [self._tracked(table, df) for df in [deleted, before] if df is not None]
+        self._apply(table, added, removed)
+
+        # keep the tracked rows in step so the next sync diffs against them
+        if table in self.rows:
+            rows, hashes = _restore(self.rows[table]), self.hashes[table]
+            for df in removed:
+                keep = _missing_from(_multiset_keys(hashes), _multiset_keys(_row_hashes(df)))
+                rows, hashes = rows[keep], hashes[keep]
+            hashes = np.concatenate([hashes] + [_row_hashes(df) for df in added])
+            self._track(table, pd.concat([rows] + added, ignore_index=True), hashes)
+        return self._refresh()
+
+    def _columns(self, table):
+        return self.spec[table]['mean'] + self.spec[table]['mode']
+
+    def _tracked(self, table, df):
+        return df[self._columns(table)].reset_index(drop=True)
+
+    def _rebuild_table(self, table, rows):
+        for col in self.spec[table]['mean']:
+            self.sums[col] = exact_sum(rows[col])
+            self.counts[col] = int(rows[col].count())
+        for col in self.spec[table]['mode']:
+            self.freqs[col] = rows[col].value_counts()
+        self._track(table, rows)
+
+    def _track(self, table, rows, hashes=None, keys=None):
+        """Remember a table's rows and their multiset keys for the next sync's diff."""
+        hashes = _row_hashes(rows) if hashes is None else hashes
+        self.rows[table] = _store(rows)
+        self.hashes[table] = hashes
+        self.keys[table] = _multiset_keys(hashes) if keys is None else keys
+
+    def _apply(self, table, added, removed):
+        for df, sign in [(df, 1) for df in added] + [(df, -1) for df in removed]:
+            if not len(df):
+                continue
+            for col in self.spec[table]['mean']:
+                self.sums[col] += sign * exact_sum(df[col])
+                self.counts[col] += sign * int(df[col].count())
+            for col in self.spec[table]['mode']:
+                freq = self.freqs[col].add(sign * df[col].value_counts(), fill_value=0)
+                self.freqs[col] = freq[freq > 0].astype('int64')
+
+    def _compute_fills(self):
+        fills = {}
+        for col, count in self.counts.items():
+            if count:
+                fills[col] = float(self.sums[col] / count)
+        for col, freq in self.freqs.items():
+            if len(freq):
+                # like .mode()[0]: the smallest of the most frequent values
+                fills[col] = freq[freq == freq.max()].index.sort_values()[0]
+        return fills
+
+    def _refresh(self):
+        fills = self._compute_fills()
+        if fills == self._fills:
+            return False
+        self._fills = fills
+        self.version += 1
+        return True
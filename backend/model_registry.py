@@ -0,0 +1,142 @@
+import os
+import json
+import threading
+import joblib
+from sklearn.preprocessing import LabelEncoder
+
+
+# written by gs_api after every sync, read by train_model.py
+SNAPSHOT_PATH = os.getenv('SNAPSHOT_PATH', 'snapshot.pkl')
+MODELS_DIR = os.getenv('MODELS_DIR', 'models')
+LEGACY_MODEL_PATH = 'Student_risk_model.pkl'
+
+# order the model sees its inputs in; saved with every bundle
+FEATURE_COLUMNS = [
+    'attendance_percentage',
+    'q1_average_test_score', 'q2_average_test_score', 'q3_average_test_score',
+    'q1_test_score_trend', 'q2_test_score_trend', 'q3_test_score_trend',
+    'q1_attempts_used', 'q2_attempts_used', 'q3_attempts_used',
+    'fee_status', 'fee_due_date'
+]
+
+
+class ModelBundle:
+    """A trained model plus everything needed to feed it: encoders, column order, metrics."""
+
+    def __init__(self, version, model, encoders=None, feature_columns=None, metrics=None):
+        self.version = version
+        self.model = model
+        self.encoders = encoders or {}
+        self.feature_columns = feature_columns
+        self.metrics = metrics or {}
+
+    def encode(self, df):
+        """
+        Encode the categorical snapshot columns the way the model was trained.
+
+        :param df: Snapshot dataframe with the imputed feature columns.
+        :return: Encoded copy of df.
+        """
+        df = df.copy()
+        if self.feature_columns is None:
+            # legacy pickle ships no encoder, so refit one per run like before
+            df['fee_status'] = LabelEncoder().fit_transform(df['fee_status'])
+            return df
+
+        for col, le in self.encoders.items():
+            # labels unseen at training time fall back to the training mode
+            known = df[col].isin(le.classes_)
+            df[col] = le.transform(df[col].where(known, le.fallback_))
+        return df
+
+    def feature_matrix(self, df):
+        """Numpy array of an encoded dataframe, columns in training order."""
+        if self.feature_columns is None:
+            return df.drop(['student_id', 'student_name', 'program'], axis=1).values
+        return df[self.feature_columns].values
+
+
+def save_bundle(bundle, models_dir=MODELS_DIR):
+    """
+    Write a bundle to models_dir/<version>/ and point LATEST at it.
+
+    Refuses to reuse an existing version directory, which LATEST may point at.
+    """
+    path = os.path.join(models_dir, bundle.version)
+    os.makedirs(path, exist_ok=False)
+    joblib.dump(bundle.model, os.path.join(path, 'model.joblib'))
+    joblib.dump(bundle.encoders, os.path.join(path, 'encoders.joblib'))
+    with open(os.path.join(path, 'manifest.json'), 'w') as f:
+        json.dump({
+            'version': bundle.version,
+            'feature_columns': bundle.feature_columns,
+            'metrics': bundle.metrics
+        }, f, indent=2)
+
+    # swap LATEST atomically so a running server never reads half a version name
+    tmp = os.path.join(models_dir, 'LATEST.tmp')
+    with open(tmp, 'w') as f:
+        f.write(bundle.version)
+    os.replace(tmp, os.path.join(models_dir, 'LATEST'))
+    return path
+
+
+def load_bundle(version, models_dir=MODELS_DIR):
+    path = os.path.join(models_dir, version)
+    with open(os.path.join(path, 'manifest.json')) as f:
+        manifest = json.load(f)
+    return ModelBundle(
+        version=manifest['version'],
+        model=joblib.load(os.path.join(path, 'model.joblib')),
+        encoders=joblib.load(os.path.join(path, 'encoders.joblib')),
+        feature_columns=manifest['feature_columns'],
+        metrics=manifest['metrics']
+    )
+
+
+class ModelRegistry:
+    """
+    Serves the bundle named in models_dir/LATEST and hot-swaps when it changes.
+
+    Falls back to the legacy Student_risk_model.pkl while no bundle has been trained.
+    If the version LATEST points at can't be loaded, the previous bundle keeps serving
+    until LATEST moves again.
+    """
+
+    def __init__(self, models_dir=MODELS_DIR, legacy_path=LEGACY_MODEL_PATH):
+        self.models_dir = models_dir
+        self.legacy_path = legacy_path
+        self._lock = threading.Lock()
+        self._latest_mtime = None
+        self._bundle = None
+
+    def _latest_version(self):
+        with open(os.path.join(self.models_dir, 'LATEST')) as f:
+            return f.read().strip()
+
+    def _swap(self):
+        try:
+            version = self._latest_version()
+            if self._bundle is None or self._bundle.version != version:
+                self._bundle = load_bundle(version, self.models_dir)
+        except Exception as e:
+            print(f"Failed to load model from {self.models_dir}/LATEST: {e}")
+            if self._bundle is None:
+                self._bundle = ModelBundle('legacy', joblib.load(self.legacy_path))
+
+    def current(self):
+        """Return the live bundle, reloading it if LATEST moved since the last call."""
+        latest = os.path.join(self.models_dir, 'LATEST')
+        mtime = os.path.getmtime(latest) if os.path.exists(latest) else None
+
+        if self._bundle is not None and mtime == self._latest_mtime:
+            return self._bundle
+
+        with self._lock:
+            if self._bundle is None or mtime != self._latest_mtime:
+                if mtime is None:
+                    self._bundle = ModelBundle('legacy', joblib.load(self.legacy_path))
+                else:
+                    self._swap()
+                self._latest_mtime = mtime
+        return self._bundle
@@ -0,0 +1,143 @@
+from fractions import Fraction
+import numpy as np
+import pandas as pd
+from imputation_stats import ImputationStats, IMPUTATION_SPEC, exact_sum
+
+
+def make_frames(n, seed):
+    rng = np.random.default_rng(seed)
+    attendance = pd.DataFrame({
+        'student_id': [str(i) for i in range(n)],
+        'attendance_percentage': rng.uniform(40, 100, n)
+    })
+    attendance.loc[rng.choice(n, 5, replace=False), 'attendance_percentage'] = np.nan
+
+    assessments = pd.DataFrame({'student_id': [str(i) for i in range(n)]})
+    for q in ['q1', 'q2', 'q3']:
+        # gs_api stores q2/q3 averages as ints and q1 as it comes from the sheet
+        scores = rng.uniform(40, 95, n)
+        assessments[f'{q}_average_test_score'] = scores if q == 'q1' else scores.round()
+        assessments[f'{q}_test_score_trend'] = rng.integers(-5, 1, n)
+        assessments[f'{q}_attempts_used'] = rng.integers(1, 5, n)
+
+    fees = pd.DataFrame({
+        'student_id': [str(i) for i in range(n)],
+        'fee_status': rng.choice(['Paid', 'Due', 'Overdue'], n),
+        'fee_due_date': rng.integers(0, 30, n)
+    })
+    return {'attendance': attendance, 'assessments': assessments, 'fees': fees}
+
+
+def batch_fills(frames):
+    """Fill values from full-column passes: exact mean rounded once, `.mode()[0]`."""
+    fills = {}
+    for table, columns in IMPUTATION_SPEC.items():
+        for col in columns['mean']:
+            values = frames[table][col].dropna()
+            fills[col] = float(sum(map(Fraction, values)) / len(values))
+        for col in columns['mode']:
+            fills[col] = frames[table][col].mode()[0]
+    return fills
+
+
+def churn(frames, seed):
+    """Insert, update and delete a few rows of every table."""
+    new_frames = make_frames(10, seed + 100)
+    changes = {}
+    result = {}
+    for table, df in frames.items():
+        deleted = df.sample(4, random_state=seed)
+        kept = df.drop(deleted.index)
+        before = kept.sample(6, random_state=seed + 1)
+        after = before.copy()
+        for col in IMPUTATION_SPEC[table]['mean'] + IMPUTATION_SPEC[table]['mode']:
+            after[col] = new_frames[table][col].values[:6]
+        inserted = new_frames[table].iloc[6:]
+        result[table] = pd.concat([kept.drop(before.index), after, inserted], ignore_index=True)
+        changes[table] = {'inserted': inserted, 'updated': (before, after), 'deleted': deleted}
+    return result, changes
+
+
+def test_exact_sum():
+    values = pd.Series([0.1, 0.2, np.nan, -0.3, 1e16, 1.0, -1e16, 3.5e-10])
+    assert exact_sum(values) == sum(map(Fraction, values.dropna()))
+    assert exact_sum(pd.Series([], dtype='float64')) == 0
+
+
+def test_rebuild_matches_batch_exactly():
+    frames = make_frames(500, 0)
+    stats = ImputationStats()
+    assert stats.rebuild(frames)
+    assert stats.fill_values() == batch_fills(frames)
+
+
+def test_matches_pandas_on_integer_valued_columns():
+    frames = make_frames(500, 3)
+    fills = ImputationStats()
+    fills.rebuild(frames)
+    fills = fills.fill_values()
+    assessments = frames['assessments']
+    for col in ['q2_average_test_score', 'q3_average_test_score']:
+        assert fills[col] == assessments[col].mean()
+    for table, columns in IMPUTATION_SPEC.items():
+        for col in columns['mode']:
+            assert fills[col] == frames[table][col].mode()[0]
+
+
+def test_apply_tracks_batch_through_churn(tmp_path):
+    frames = make_frames(500, 1)
+    stats = ImputationStats()
+    stats.rebuild(frames)
+
+    for seed in range(5):
+        frames, changes = churn(frames, seed)
+        for table, change in changes.items():
+            stats.apply(table, **change)
+        stats.save(tmp_path / 'stats.pkl')
+        stats = ImputationStats.load(tmp_path / 'stats.pkl')
+        assert stats.fill_values() == batch_fills(frames)
+
+    # the tracked rows followed the changes, so a sync finds nothing left to do
+    version = stats.version
+    assert not stats.sync(frames)
+    assert stats.version == version
+
+
+def test_sync_derives_churn_from_full_frames(tmp_path):
+    frames = make_frames(500, 4)
+    stats = ImputationStats()
+    assert stats.sync(frames)  # cold start rebuilds
+    assert stats.fill_values() == batch_fills(frames)
+
+    for seed in range(5):
+        frames, _ = churn(frames, seed)
+        # a full refresh hands back rows in a new order
+        frames = {table: df.sample(frac=1, random_state=seed) for table, df in frames.items()}
+        stats.sync(frames)
+        stats.save(tmp_path / 'stats.pkl')
+        stats = ImputationStats.load(tmp_path / 'stats.pkl')
+        assert stats.fill_values() == batch_fills(frames)
+
+    rebuilt = ImputationStats()
+    rebuilt.rebuild(frames)
+    assert rebuilt.fill_values() == stats.fill_values()
+
+
+def test_version_moves_only_when_fills_change():
+    frames = make_frames(200, 2)
+    stats = ImputationStats()
+    stats.rebuild(frames)
+    version = stats.version
+
+    assert not stats.rebuild(frames)
+    assert not stats.sync(frames)
+    assert stats.version == version
+
+    empty = frames['fees'].iloc[:0]
+    assert not stats.apply('fees', inserted=empty)
+    assert stats.version == version
+
+    frames['fees']['fee_status'] = 'Waived'
+    assert stats.sync(frames)
+    assert stats.version == version + 1
+    assert stats.fill_values()['fee_status'] == 'Waived'
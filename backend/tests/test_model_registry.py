@@ -0,0 +1,61 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.dummy import DummyClassifier
+from sklearn.preprocessing import LabelEncoder
+from model_registry import ModelBundle, ModelRegistry, save_bundle, FEATURE_COLUMNS
+
+
+def make_bundle(version):
+    le = LabelEncoder().fit(['Paid', 'Pending'])
+    le.fallback_ = 'Paid'
+    model = DummyClassifier(strategy='prior').fit(np.zeros((3, len(FEATURE_COLUMNS))), [0, 1, 2])
+    return ModelBundle(version, model, {'fee_status': le}, FEATURE_COLUMNS, {'cv_f1_macro': 1.0})
+
+
+def point_latest_at(models_dir, version, tick):
+    # bump the mtime explicitly so the change is seen even within one clock tick
+    latest = os.path.join(models_dir, 'LATEST')
+    with open(latest, 'w') as f:
+        f.write(version)
+    os.utime(latest, ns=(tick, tick))
+
+
+def test_encode_falls_back_to_training_mode_for_unseen_labels():
+    bundle = make_bundle('v1')
+    df = pd.DataFrame({'fee_status': ['Pending', 'Waived', 'Paid']})
+    assert bundle.encode(df)['fee_status'].tolist() == [1, 0, 0]
+
+
+def test_save_bundle_refuses_existing_version(tmp_path):
+    save_bundle(make_bundle('v1'), tmp_path)
+    with pytest.raises(FileExistsError):
+        save_bundle(make_bundle('v1'), tmp_path)
+
+
+def test_registry_switches_when_latest_changes(tmp_path):
+    save_bundle(make_bundle('v1'), tmp_path)
+    save_bundle(make_bundle('v2'), tmp_path)
+    point_latest_at(tmp_path, 'v1', 1_000_000_000)
+
+    registry = ModelRegistry(tmp_path, legacy_path=None)
+    first = registry.current()
+    assert first.version == 'v1'
+    assert registry.current() is first
+
+    point_latest_at(tmp_path, 'v2', 2_000_000_000)
+    assert registry.current().version == 'v2'
+
+
+def test_registry_keeps_previous_bundle_when_latest_is_missing(tmp_path, capsys):
+    save_bundle(make_bundle('v1'), tmp_path)
+    point_latest_at(tmp_path, 'v1', 1_000_000_000)
+    registry = ModelRegistry(tmp_path, legacy_path=None)
+    assert registry.current().version == 'v1'
+
+    point_latest_at(tmp_path, 'gone', 2_000_000_000)
+    assert registry.current().version == 'v1'
+    assert registry.current().version == 'v1'
+    # logged once, not on every request
+    assert capsys.readouterr().out.count('Failed to load model') == 1
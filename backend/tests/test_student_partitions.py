@@ -0,0 +1,97 @@
+import sys
+import json
+import types
+import numpy as np
+import pandas as pd
+import pytest
+from flask import Flask
+from flask_restful import Api
+from flask_jwt_extended import JWTManager, create_access_token
+
+
+def make_snapshot():
+    df_filled = pd.DataFrame({
+        'student_id': ['1', '2', '3', '4'],
+        'student_name': ['Asha', 'Ravi', 'Meena', 'Kiran'],
+        'mentor_email': ['Priya@gmail.com ', 'priya@gmail.com', 'arjun@gmail.com', ' ARJUN@gmail.com'],
+        'attendance_percentage': [91.0, 64.5, np.nan, 48.0]
+    })
+    final_df = df_filled.drop(['mentor_email'], axis=1)
+    final_df['high_risk'] = [10.0, 55.0, 80.0, 95.0]
+    return df_filled, final_df
+
+
+@pytest.fixture(scope='module')
+def partitions_module():
+    # gs_api runs the sheets/Supabase sync on import; serve a fixed snapshot instead
+    df_filled, final_df = make_snapshot()
+    gs_api = types.ModuleType('gs_api')
+    gs_api.df_filled = df_filled
+    gs_api.current_final_df = lambda: final_df
+    gs_api.scoring_key = lambda: ('test', 1)
+    gs_api.students_df = gs_api.attendance_df = gs_api.assessments_df = gs_api.fees_df = df_filled
+    sys.modules['gs_api'] = gs_api
+
+    from application import student_partitions, students_func
+    yield student_partitions, students_func
+    del sys.modules['gs_api']
+
+
+@pytest.fixture
+def client(partitions_module):
+    _, students_func = partitions_module
+    app = Flask(__name__)
+    app.config['JWT_SECRET_KEY'] = 'test-secret-key-that-is-long-enough'
+    JWTManager(app)
+    Api(app).add_resource(students_func.Mentor_students_df, '/mentor/students_df')
+    return app
+
+
+def auth_header(app, **claims):
+    with app.app_context():
+        token = create_access_token(identity='1', additional_claims=claims)
+    return {'Authorization': f'Bearer {token}'}
+
+
+def test_partitions_grouped_by_normalized_email(partitions_module):
+    student_partitions, _ = partitions_module
+    df_filled, final_df = make_snapshot()
+
+    partitions = student_partitions.partition_by_mentor(final_df, df_filled['mentor_email'])
+
+    assert set(partitions) == {'priya@gmail.com', 'arjun@gmail.com'}
+    priya = json.loads(partitions['priya@gmail.com'][0])
+    assert [s['student_id'] for s in priya] == ['1', '2']
+    arjun = json.loads(partitions['arjun@gmail.com'][0])
+    assert arjun[0]['attendance_percentage'] is None
+
+
+def test_etag_stable_when_other_mentor_changes(partitions_module):
+    student_partitions, _ = partitions_module
+    df_filled, final_df = make_snapshot()
+    before = student_partitions.partition_by_mentor(final_df, df_filled['mentor_email'])
+
+    final_df.loc[df_filled['student_id'] == '3', 'high_risk'] = 12.0
+    after = student_partitions.partition_by_mentor(final_df, df_filled['mentor_email'])
+
+    assert after['priya@gmail.com'][1] == before['priya@gmail.com'][1]
+    assert after['arjun@gmail.com'][1] != before['arjun@gmail.com'][1]
+
+
+def test_endpoint_serves_callers_partition_and_304(client):
+    headers = auth_header(client, email=' Priya@Gmail.com')
+    with client.test_client() as c:
+        response = c.get('/mentor/students_df', headers=headers)
+        assert response.status_code == 200
+        assert [s['student_id'] for s in response.get_json()] == ['1', '2']
+        etag = response.headers['ETag']
+
+        cached = c.get('/mentor/students_df', headers={**headers, 'If-None-Match': etag})
+        assert cached.status_code == 304
+        assert cached.data == b''
+
+
+def test_endpoint_rejects_token_without_email(client):
+    with client.test_client() as c:
+        response = c.get('/mentor/students_df', headers=auth_header(client))
+        assert response.status_code == 401
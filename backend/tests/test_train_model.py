@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+import pytest
+from train_model import risk_labels, check_labels
+
+
+def realistic_snapshot(n, seed):
+    """Imputed frame shaped like the one gs_api writes to snapshot.pkl."""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'student_id': [str(i) for i in range(n)],
+        'attendance_percentage': np.clip(rng.normal(78, 14, n), 20, 100)
+    })
+    for q, max_attempts in [('q1', 3), ('q2', 4), ('q3', 5)]:
+        df[f'{q}_average_test_score'] = np.clip(rng.normal(70, 13, n), 20, 100).round()
+        # score - max_score, so never positive
+        df[f'{q}_test_score_trend'] = -rng.integers(0, 40, n)
+        weights = [0.6, 0.25] + [0.15 / (max_attempts - 2)] * (max_attempts - 2)
+        df[f'{q}_attempts_used'] = rng.choice(np.arange(1, max_attempts + 1), n, p=weights)
+    paid = rng.random(n) < 0.8
+    df['fee_status'] = np.where(paid, 'Paid', 'Pending')
+    df['fee_due_date'] = np.where(paid, 0, rng.integers(5, 60, n))
+    return df
+
+
+def test_risk_labels_cover_every_level_on_a_realistic_snapshot():
+    y = risk_labels(realistic_snapshot(400, 0))
+    assert set(np.unique(y)) == {0, 1, 2}
+    check_labels(y, cv=5)
+
+
+def test_risk_labels_follow_the_rule():
+    df = realistic_snapshot(3, 1)
+    df[['q1_attempts_used', 'q2_attempts_used', 'q3_attempts_used']] = 1
+    df[['q1_average_test_score', 'q2_average_test_score', 'q3_average_test_score']] = 80
+    df['attendance_percentage'] = 90
+    df['fee_due_date'] = 0
+    df.loc[1, 'q2_attempts_used'] = 2           # a retry -> medium
+    df.loc[2, 'q3_average_test_score'] = 65     # 15 point drop -> declining, high
+    assert risk_labels(df).tolist() == [0, 1, 2]
+
+
+def test_check_labels_refuses_missing_level():
+    with pytest.raises(SystemExit, match='only risk levels'):
+        check_labels(np.array([1, 2] * 20), cv=5)
+
+
+def test_check_labels_refuses_classes_smaller_than_cv():
+    with pytest.raises(SystemExit, match='below --cv 5'):
+        check_labels(np.array([0] * 3 + [1] * 20 + [2] * 20), cv=5)
@@ -0,0 +1,165 @@
+"""
+Offline retraining for the student risk model.
+
+Reads the snapshot gs_api writes after each sync, runs a cross-validated
+hyperparameter search over a process pool, benchmarks every candidate and
+saves the best one as a versioned bundle that the server hot-swaps to.
+
+    python train_model.py --snapshot snapshot.pkl --models-dir models
+"""
+import os
+import time
+import argparse
+import tempfile
+import datetime
+from itertools import product
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+import joblib
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.model_selection import StratifiedKFold, cross_validate
+from sklearn.preprocessing import LabelEncoder
+from model_registry import ModelBundle, save_bundle, FEATURE_COLUMNS, SNAPSHOT_PATH, MODELS_DIR
+
+
+PARAM_GRID = {
+    'n_estimators': [100, 200, 400],
+    'max_depth': [None, 8, 16],
+    'min_samples_leaf': [1, 3]
+}
+
+# average test score drop between consecutive quarters that counts as declining
+DECLINE_POINTS = 10
+
+
+def risk_labels(df):
+    """
+    Label the snapshot with the notebook's rule, mapped onto the snapshot columns.
+
+    0 -> low, 1 -> medium, 2 -> high risk. The notebook's synthetic data had a
+    'Declining' flag; the snapshot's qN_test_score_trend is qN_score - qN_max_score
+    (<= 0 for nearly everyone), so a quarter counts as declining when its average
+    test score dropped more than DECLINE_POINTS below the previous quarter's. The
+    notebook's medium clause `attempts >= 1` matches every student who sat a quiz,
+    so a retry (2+ attempts) counts instead. A non-zero fee_due_date is unpaid fees.
+    """
+    avg = df[['q1_average_test_score', 'q2_average_test_score', 'q3_average_test_score']]
+    declining = ((df['q1_average_test_score'] - df['q2_average_test_score'] > DECLINE_POINTS)
+                 | (df['q2_average_test_score'] - df['q3_average_test_score'] > DECLINE_POINTS))
+    attempts = df[['q1_attempts_used', 'q2_attempts_used', 'q3_attempts_used']]
+
+    high = ((df['attendance_percentage'] < 50) | (avg < 50).any(axis=1) | declining
+            | (attempts >= [3, 4, 5]).any(axis=1) | (df['fee_due_date'] > 0))
+    medium = ((df['attendance_percentage'] < 70) | (avg < 60).any(axis=1)
+              | (attempts >= 2).any(axis=1))
+    return np.where(high, 2, np.where(medium, 1, 0))
+
+
+def check_labels(y, cv):
+    """
+    Refuse labels that would train a degenerate model.
+
+    The server reads all three risk levels from predict_proba, and StratifiedKFold
+    needs at least `cv` rows of every class.
+    """
+    classes, counts = np.unique(y, return_counts=True)
+    if len(classes) < 3:
+        raise SystemExit(f"Refusing to train: labels cover only risk levels {classes.tolist()}, need 0, 1 and 2")
+    if counts.min() < cv:
+        raise SystemExit(f"Refusing to train: class counts {dict(zip(classes.tolist(), counts.tolist()))} "
+                         f"are below --cv {cv}")
+
+
+def fit_encoders(df):
+    le = LabelEncoder().fit(df['fee_status'])
+    le.fallback_ = df['fee_status'].mode()[0]
+    return {'fee_status': le}
+
+
+def evaluate(params, X, y, cv):
+    """Cross-validate one candidate, then refit it on all rows. Runs in a worker process."""
+    model = RandomForestClassifier(random_state=42, n_jobs=1, **params)
+    folds = StratifiedKFold(n_splits=cv, shuffle=True, random_state=42)
+    scores = cross_validate(model, X, y, cv=folds, scoring=['accuracy', 'f1_macro'])
+    model.fit(X, y)
+    return params, model, {
+        'cv_accuracy': float(scores['test_accuracy'].mean()),
+        'cv_f1_macro': float(scores['test_f1_macro'].mean()),
+        'fit_seconds': float(scores['fit_time'].mean())
+    }
+
+
+def benchmark(model, X, repeat=5):
+    """Time loading the saved model and predict_proba over the whole snapshot."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'model.joblib')
+        joblib.dump(model, path)
+        start = time.perf_counter()
+        loaded = joblib.load(path)
+        load_seconds = time.perf_counter() - start
+        size_mb = os.path.getsize(path) / 1e6
+
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            loaded.predict_proba(X)
+            timings.append(time.perf_counter() - start)
+        del loaded
+
+    inference_seconds = min(timings)
+    return {
+        'load_seconds': load_seconds,
+        'inference_seconds': inference_seconds,
+        'rows_per_second': len(X) / inference_seconds,
+        'size_mb': size_mb
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Retrain the student risk model from the latest snapshot.")
+    parser.add_argument('--snapshot', default=SNAPSHOT_PATH, help="snapshot pickle written by gs_api")
+    parser.add_argument('--models-dir', default=MODELS_DIR, help="where versioned bundles are saved")
+    parser.add_argument('--cv', type=int, default=5, help="number of cross-validation folds")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="processes for the search")
+    args = parser.parse_args()
+
+    df = pd.read_pickle(args.snapshot)
+    if 'risk_label' in df:
+        y = df['risk_label'].values
+    else:
+        print("Snapshot has no risk_label column, labelling it with the notebook's rule")
+        y = risk_labels(df)
+    check_labels(y, args.cv)
+
+    encoders = fit_encoders(df)
+    # microseconds keep two runs in the same second from sharing a directory
+    version = datetime.datetime.now(datetime.timezone.utc).strftime('%Y%m%dT%H%M%S%f')
+    bundle = ModelBundle(version, None, encoders, FEATURE_COLUMNS)
+    X = bundle.feature_matrix(bundle.encode(df))
+
+    candidates = [dict(zip(PARAM_GRID, values)) for values in product(*PARAM_GRID.values())]
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        results = list(pool.map(evaluate, candidates, [X] * len(candidates), [y] * len(candidates),
+                                [args.cv] * len(candidates)))
+
+    print(f"{'params':<64} {'cv_acc':>7} {'cv_f1':>7} {'load_s':>8} {'infer_ms':>9} {'size_mb':>8}")
+    ranked = []
+    for params, model, metrics in results:
+        metrics.update(benchmark(model, X))
+        ranked.append((params, model, metrics))
+        print(f"{str(params):<64} {metrics['cv_accuracy']:>7.4f} {metrics['cv_f1_macro']:>7.4f} "
+              f"{metrics['load_seconds']:>8.4f} {metrics['inference_seconds'] * 1000:>9.2f} "
+              f"{metrics['size_mb']:>8.2f}")
+
+    # best f1, faster inference breaks ties
+    params, model, metrics = max(ranked, key=lambda r: (r[2]['cv_f1_macro'], -r[2]['inference_seconds']))
+    bundle.model = model
+    bundle.metrics = dict(metrics, params=params, n_rows=len(X), cv_folds=args.cv,
+                          candidates=[dict(m, params=p) for p, _, m in ranked])
+    path = save_bundle(bundle, args.models_dir)
+    print(f"Saved version {version} to {path} ({params})")
+
+
+if __name__ == '__main__':
+    main()